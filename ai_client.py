@@ -1,32 +1,107 @@
 #!/usr/bin/env python3
 
 import os
+import time
+import asyncio
+import hashlib
 import requests
-import json
-from pathlib import Path
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Iterator, Callable, MutableMapping
+from api_key import read_api_key
+from http_session import create_session, create_async_client, preconnect, apost
+from json_codec import json_dumps, json_loads
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+    httpx = None
+
+
+class LRUCache:
+    
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 1800):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+    
+    def __setitem__(self, key: str, value: Any):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def clear(self):
+        self._data.clear()
 
 
 class AIClient:
     
-    def __init__(self, api_key_file: str = "neuroKEY.txt"):
+    def __init__(self, 
+                 api_key_file: str = "neuroKEY.txt",
+                 cache: Optional[MutableMapping[str, Any]] = None):
         self.api_key = self._read_api_key(api_key_file)
         self.base_url = "https://api.x.ai/v1"
         self.chat_url = f"{self.base_url}/chat/completions"
+        
+        self._session = create_session(self.api_key)
+        
+        self._cache = cache if cache is not None else LRUCache()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        
+        self._async_client = None
+    
+    def preconnect(self):
+        preconnect(self._session, self.base_url)
+    
+    def close(self):
+        self._session.close()
+    
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+        self._async_client = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
     
     def _read_api_key(self, filename: str) -> str:
-        try:
-            key_path = Path(filename)
-            if not key_path.exists():
-                raise FileNotFoundError(f"none: {filename}")
-            
-            api_key = key_path.read_text(encoding="utf-8").strip()
-            if not api_key:
-                raise ValueError(f"empty: {filename}")
-            
-            return api_key
-        except Exception as e:
-            raise RuntimeError(f"fail: {e}")
+        return read_api_key(filename)
+    
+    @staticmethod
+    def _cache_key(model: str, temperature: float, message: str) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(json_dumps([model, temperature, message]))
+        return h.hexdigest()
+    
+    def stats(self) -> Dict[str, Any]:
+        total = self._cache_hits + self._cache_misses
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._cache),
+            "hit_rate": self._cache_hits / total if total else 0.0
+        }
     
     def chat(self, 
              message: str, 
@@ -34,10 +109,25 @@ class AIClient:
              temperature: float = 0.7,
              stream: bool = False) -> Dict[str, Any]:
     
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+        if stream:
+            content = "".join(self.chat_stream(message, model, temperature))
+            return {
+                "choices": [
+                    {
+                        "message": {
+                            "role": "assistant",
+                            "content": content
+                        }
+                    }
+                ]
+            }
+        
+        cache_key = self._cache_key(model, temperature, message)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached
+        self._cache_misses += 1
         
         payload = {
             "messages": [
@@ -47,29 +137,178 @@ class AIClient:
                 }
             ],
             "model": model,
-            "stream": stream,
+            "stream": False,
             "temperature": temperature
         }
         
+        result = self._post_chat(json_dumps(payload))
+        self._cache[cache_key] = result
+        return result
+    
+    def _post_chat(self, body: bytes) -> Dict[str, Any]:
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.chat_url, 
-                headers=headers, 
-                data=json.dumps(payload),
+                data=body,
                 timeout=30
             )
             response.raise_for_status()  
             
-            return response.json()
+            return json_loads(response.content)
+        except requests.exceptions.Timeout:
+            raise
+        except requests.exceptions.RequestException as e:
+            raise self._request_error(e)
+    
+    def make_fast_chat(self, 
+                       model: str = "grok-4", 
+                       temperature: float = 0.7) -> Callable[[str], Dict[str, Any]]:
+    
+        # Encode the fixed part of the payload once; only the content varies per call
+        placeholder = "__NEUROHUD_CONTENT__"
+        template = json_dumps({
+            "messages": [
+                {
+                    "role": "user",
+                    "content": placeholder
+                }
+            ],
+            "model": model,
+            "stream": False,
+            "temperature": temperature
+        })
+        head, tail = template.split(json_dumps(placeholder), 1)
+        
+        def fast_chat(message: str) -> Dict[str, Any]:
+            cache_key = self._cache_key(model, temperature, message)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache_hits += 1
+                return cached
+            self._cache_misses += 1
+            
+            result = self._post_chat(head + json_dumps(message) + tail)
+            self._cache[cache_key] = result
+            return result
+        
+        return fast_chat
+    
+    def chat_stream(self, 
+                    message: str, 
+                    model: str = "grok-4", 
+                    temperature: float = 0.7) -> Iterator[str]:
+    
+        payload = {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": message
+                }
+            ],
+            "model": model,
+            "stream": True,
+            "temperature": temperature
+        }
+        
+        try:
+            with self._session.post(
+                self.chat_url, 
+                data=json_dumps(payload),
+                stream=True,
+                timeout=30
+            ) as response:
+                response.raise_for_status()
+                
+                for line in response.iter_lines():
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+                    
+                    choices = json_loads(data).get("choices") or [{}]
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+        except requests.exceptions.Timeout:
+            raise
         except requests.exceptions.RequestException as e:
-            error_msg = f"fail: {e}"
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_detail = e.response.json()
-                    error_msg += f"\n: {error_detail}"
-                except:
-                    error_msg += f"\n: {e.response.text}"
-            raise RuntimeError(error_msg)
+            raise self._request_error(e)
+    
+    @staticmethod
+    def _request_error(e: requests.exceptions.RequestException) -> RuntimeError:
+        error_msg = f"fail: {e}"
+        if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+            try:
+                error_detail = json_loads(e.response.content)
+                error_msg += f"\n: {error_detail}"
+            except ValueError:
+                error_msg += f"\n: {e.response.text}"
+        return RuntimeError(error_msg)
+    
+    def _get_async_client(self):
+        if self._async_client is None:
+            # With HTTP/2 all concurrent requests multiplex over one connection
+            self._async_client = create_async_client(self.api_key)
+        return self._async_client
+    
+    async def achat(self, 
+                    message: str, 
+                    model: str = "grok-4", 
+                    temperature: float = 0.7) -> Dict[str, Any]:
+    
+        cache_key = self._cache_key(model, temperature, message)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached
+        self._cache_misses += 1
+        
+        payload = {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": message
+                }
+            ],
+            "model": model,
+            "stream": False,
+            "temperature": temperature
+        }
+        
+        client = self._get_async_client()
+        try:
+            # Retries 429/5xx like the sync session, so one rate limit doesn't fail a chat_many batch
+            response = await apost(client, self.chat_url, content=json_dumps(payload))
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"fail: {e}")
+        if response.status_code >= 400:
+            raise RuntimeError(f"fail: {response.status_code} {response.reason_phrase}\n: {response.text}")
+        result = json_loads(response.content)
+        
+        self._cache[cache_key] = result
+        return result
+    
+    def chat_many(self, 
+                  messages: List[str], 
+                  model: str = "grok-4", 
+                  temperature: float = 0.7,
+                  max_concurrency: int = 10) -> List[Dict[str, Any]]:
+    
+        async def run_all():
+            sem = asyncio.Semaphore(max_concurrency)
+            
+            async def bounded(message: str) -> Dict[str, Any]:
+                async with sem:
+                    return await self.achat(message, model, temperature)
+            
+            try:
+                return await asyncio.gather(*[bounded(m) for m in messages])
+            finally:
+                # Async connections are bound to the loop that created them
+                await self.aclose()
+        
+        return asyncio.run(run_all())
     
     def get_response_text(self, response: Dict[str, Any]) -> str:
         try:
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+API key loading shared by the XAI clients
+Key files are read once per resolved path and cached for the process lifetime
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=8)
+def _read_api_key_cached(resolved_path: str) -> str:
+    key_path = Path(resolved_path)
+    if not key_path.exists():
+        raise FileNotFoundError(f"API key file not found: {resolved_path}")
+    
+    api_key = key_path.read_text(encoding="utf-8").strip()
+    if not api_key:
+        raise ValueError(f"API key file is empty: {resolved_path}")
+    
+    return api_key
+
+
+def read_api_key(filename: str) -> str:
+    """
+    Read API key from file, reusing the cached value on repeated calls
+    
+    Args:
+        filename: Path to API key file
+        
+    Returns:
+        API key string
+        
+    Raises:
+        RuntimeError: File does not exist or is empty
+    """
+    try:
+        return _read_api_key_cached(str(Path(filename).resolve()))
+    except Exception as e:
+        raise RuntimeError(f"Failed to read API key: {e}")
+
+
+def invalidate_api_key_cache():
+    """Drop cached API keys so the next read picks up a rotated key"""
+    _read_api_key_cached.cache_clear()
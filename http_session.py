@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+HTTP session factory shared by the XAI clients
+Provides pooled keep-alive connections with retry on transient failures
+"""
+
+import asyncio
+import importlib.util
+import requests
+from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+    httpx = None
+
+# HTTP/2 in httpx needs the optional h2 package
+HAS_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+# Retry rate limits and transient server errors on the same pooled session.
+# Read errors are not retried: a POST that timed out may already be billed.
+RETRY_POLICY = Retry(
+    total=5,
+    read=False,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["POST"],
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+
+def create_session(
+    api_key: str,
+    content_type: Optional[str] = "application/json",
+    pool_maxsize: int = 16
+) -> requests.Session:
+    """
+    Create a requests session for the XAI API
+    
+    Args:
+        api_key: API key sent as a Bearer token on every request
+        content_type: Default Content-Type header, None to let requests set it
+            per request (e.g. for multipart uploads)
+        pool_maxsize: Maximum connections kept per host
+        
+    Returns:
+        Session with default headers, connection pooling and retries
+    """
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {api_key}"
+    if content_type:
+        session.headers["Content-Type"] = content_type
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=RETRY_POLICY)
+    session.mount("https://", adapter)
+    return session
+
+
+def preconnect(session: requests.Session, url: str):
+    """Open a pooled HTTPS connection ahead of the first request (errors ignored)"""
+    try:
+        session.head(url, timeout=5)
+    except requests.exceptions.RequestException:
+        pass
+
+
+def create_async_client(
+    api_key: str,
+    content_type: Optional[str] = "application/json",
+    max_connections: int = 4,
+    timeout: float = 30.0
+):
+    """
+    Create an httpx AsyncClient for the XAI API
+    
+    The transport retries failed connects; status-code retries are done per
+    request by apost(), matching RETRY_POLICY.
+    
+    Args:
+        api_key: API key sent as a Bearer token on every request
+        content_type: Default Content-Type header, None to set it per request
+        max_connections: Maximum connections kept per host
+        timeout: Request timeout in seconds
+        
+    Returns:
+        AsyncClient using HTTP/2 when h2 is installed
+    """
+    if not HAS_HTTPX or httpx is None:
+        raise RuntimeError("httpx not installed: pip install 'httpx[http2]'")
+    headers = {"Authorization": f"Bearer {api_key}"}
+    if content_type:
+        headers["Content-Type"] = content_type
+    transport = httpx.AsyncHTTPTransport(
+        http2=HAS_HTTP2,
+        retries=RETRY_POLICY.total,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+    return httpx.AsyncClient(headers=headers, transport=transport, timeout=timeout)
+
+
+async def apost(client, url: str, **kwargs):
+    """
+    POST with an async client, retrying rate limits and transient server errors
+    
+    Uses the status codes, attempt count and backoff of RETRY_POLICY, and
+    honours Retry-After. Read errors and timeouts are not retried.
+    
+    Returns:
+        The final httpx Response
+    """
+    attempts = RETRY_POLICY.total
+    for attempt in range(attempts + 1):
+        response = await client.post(url, **kwargs)
+        if response.status_code not in RETRY_POLICY.status_forcelist or attempt == attempts:
+            return response
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = RETRY_POLICY.backoff_factor * (2 ** attempt)
+        await response.aclose()
+        await asyncio.sleep(delay)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+JSON codec shared by the XAI clients
+Uses orjson when installed and falls back to the stdlib json module
+"""
+
+import json
+from typing import Any
+
+# Try importing orjson for faster JSON encoding/decoding
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize obj to compact JSON bytes"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)  # type: ignore
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_dumps_text(obj: Any) -> str:
+    """Serialize obj to a compact JSON str (e.g. for WebSocket text frames)"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj).decode("utf-8")  # type: ignore
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes"""
+    if HAS_ORJSON:
+        return orjson.loads(data)  # type: ignore
+    return json.loads(data)
@@ -8,10 +8,14 @@ import os
 import requests
 import tempfile
 import asyncio
-import base64
-import json
-from pathlib import Path
-from typing import Optional, Callable
+import queue
+import threading
+from functools import lru_cache
+from binascii import a2b_base64
+from typing import Optional, Callable, AsyncIterable, Sequence, Union, Tuple, Dict, Any
+from api_key import read_api_key
+from http_session import create_session, preconnect
+from json_codec import json_dumps, json_dumps_text, json_loads
 
 # Try importing websockets
 try:
@@ -29,6 +33,59 @@ except ImportError:
     HAS_PYAUDIO = False
     pyaudio = None
 
+# Try importing pybase64 (SIMD base64) for decoding audio chunks
+try:
+    from pybase64 import b64decode as b64decode_audio
+    HAS_PYBASE64 = True
+except ImportError:
+    HAS_PYBASE64 = False
+    b64decode_audio = a2b_base64
+
+# Encoded audio larger than this is decoded off the event loop thread
+DECODE_OFFLOAD_THRESHOLD = 64 * 1024
+
+
+def _remove_file(path: str):
+    """Delete a file, ignoring errors if it is already gone"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _no_log(message: str):
+    """Log sink for quiet streaming"""
+
+
+async def _aiter(chunks: Union[Sequence[str], AsyncIterable[str]]):
+    """Iterate text chunks given either as a sequence or an async iterable"""
+    if isinstance(chunks, (list, tuple)):
+        for chunk in chunks:
+            yield chunk
+    else:
+        async for chunk in chunks:
+            yield chunk
+
+
+def _drain_audio(play_queue: "queue.Queue[Optional[bytes]]", write: Callable[[bytes], None]):
+    """Write queued audio chunks to the output stream until a None sentinel arrives"""
+    while True:
+        chunk = play_queue.get()
+        if chunk is None:
+            break
+        write(chunk)
+
+
+@lru_cache(maxsize=8)
+def _config_message(voice: str) -> str:
+    """Encoded realtime TTS config message for a voice (constant per voice)"""
+    return json_dumps_text({"type": "config", "data": {"voice_id": voice}})
+
+
+def _text_message(text: str, is_last: bool) -> str:
+    """Encoded realtime TTS text_chunk message"""
+    return json_dumps_text({"type": "text_chunk", "data": {"text": text, "is_last": is_last}})
+
 
 class TTSClient:
     """TTS Client class for calling XAI Text-to-Speech API"""
@@ -43,10 +100,32 @@ class TTSClient:
         self.api_key = self._read_api_key(api_key_file)
         self.base_url = "https://api.x.ai/v1"
         self.api_url = f"{self.base_url}/audio/speech"
+        
+        # Realtime WebSocket endpoint and headers are fixed per client
+        ws_url = self.base_url.replace("https://", "wss://").replace("http://", "ws://")
+        self._ws_uri = f"{ws_url}/realtime/audio/speech"
+        self._ws_headers = {"Authorization": f"Bearer {self.api_key}"}
+        
+        # Persistent session so repeated calls reuse the TCP/TLS connection
+        self._session = create_session(self.api_key)
+    
+    def preconnect(self):
+        """Open the pooled HTTPS connection ahead of the first request (errors ignored)"""
+        preconnect(self._session, self.base_url)
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
     
     def _read_api_key(self, filename: str) -> str:
         """
-        Read API key from file
+        Read API key from file (cached per resolved path)
         
         Args:
             filename: Path to API key file
@@ -55,21 +134,9 @@ class TTSClient:
             API key string
             
         Raises:
-            FileNotFoundError: File does not exist
-            ValueError: File is empty
+            RuntimeError: File does not exist or is empty
         """
-        try:
-            key_path = Path(filename)
-            if not key_path.exists():
-                raise FileNotFoundError(f"API key file not found: {filename}")
-            
-            api_key = key_path.read_text(encoding="utf-8").strip()
-            if not api_key:
-                raise ValueError(f"API key file is empty: {filename}")
-            
-            return api_key
-        except Exception as e:
-            raise RuntimeError(f"Failed to read API key: {e}")
+        return read_api_key(filename)
     
     def text_to_speech(
         self,
@@ -89,16 +156,12 @@ class TTSClient:
             Audio data as bytes
             
         Raises:
-            requests.exceptions.RequestException: Request failed
+            requests.exceptions.Timeout: Request timed out (transient, safe to retry)
+            RuntimeError: Request failed
         """
         if not text or not text.strip():
             raise ValueError("Text content cannot be empty")
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        
         data = {
             "input": text,
             "voice": voice,
@@ -106,24 +169,84 @@ class TTSClient:
         }
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.api_url,
-                headers=headers,
-                json=data,
+                data=json_dumps(data),
                 timeout=30
             )
             response.raise_for_status()
             
             return response.content
+        except requests.exceptions.Timeout:
+            raise
         except requests.exceptions.RequestException as e:
-            error_msg = f"TTS request failed: {e}"
-            if hasattr(e, 'response') and e.response is not None:
+            raise self._request_error(e)
+    
+    @staticmethod
+    def _request_error(e: requests.exceptions.RequestException) -> RuntimeError:
+        """Build a RuntimeError carrying the API error details, if any"""
+        error_msg = f"TTS request failed: {e}"
+        if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+            try:
+                error_detail = json_loads(e.response.content)
+                error_msg += f"\nDetails: {error_detail}"
+            except ValueError:
+                error_msg += f"\nResponse: {e.response.text}"
+        return RuntimeError(error_msg)
+    
+    def text_to_speech_stream_to_file(
+        self,
+        text: str,
+        output_file: str,
+        voice: str = "Ara",
+        response_format: str = "mp3",
+        chunk_size: int = 65536
+    ) -> str:
+        """
+        Convert text to speech, streaming the response body straight to a file
+        
+        Args:
+            text: Text to convert
+            output_file: Output file path
+            voice: Voice type, default "Ara"
+            response_format: Audio format, default "mp3"
+            chunk_size: Bytes read from the response per write, default 64 KiB
+            
+        Returns:
+            Path to saved audio file
+        """
+        if not text or not text.strip():
+            raise ValueError("Text content cannot be empty")
+        
+        data = {
+            "input": text,
+            "voice": voice,
+            "response_format": response_format,
+        }
+        
+        try:
+            with self._session.post(
+                self.api_url,
+                data=json_dumps(data),
+                stream=True,
+                timeout=30
+            ) as response:
+                response.raise_for_status()
+                
                 try:
-                    error_detail = e.response.json()
-                    error_msg += f"\nDetails: {error_detail}"
-                except:
-                    error_msg += f"\nResponse: {e.response.text}"
-            raise RuntimeError(error_msg)
+                    with open(output_file, "wb") as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+                except BaseException:
+                    # Don't leave a truncated audio file behind
+                    _remove_file(output_file)
+                    raise
+        except requests.exceptions.Timeout:
+            raise
+        except requests.exceptions.RequestException as e:
+            raise self._request_error(e)
+        
+        return output_file
     
     def text_to_speech_file(
         self,
@@ -139,31 +262,35 @@ class TTSClient:
             text: Text to convert
             output_file: Output file path, if None uses temporary file
             voice: Voice type, default "Ara"
-            response_format: Audio format, default "mp3"
+            response_format: Audio format, default "mp3"; "opus" gives a
+                noticeably smaller payload for the same speech if the
+                player supports it
             
         Returns:
             Path to saved audio file
         """
-        audio_data = self.text_to_speech(text, voice, response_format)
-        
-        if output_file is None:
-            # Use temporary file
-            suffix = f".{response_format}"
-            temp_file = tempfile.NamedTemporaryFile(
-                delete=False,
-                suffix=suffix,
-                prefix="tts_"
-            )
-            output_path = temp_file.name
-            temp_file.close()
-        else:
-            output_path = output_file
+        if not text or not text.strip():
+            raise ValueError("Text content cannot be empty")
         
-        # Save audio data
-        with open(output_path, "wb") as f:
-            f.write(audio_data)
+        if output_file is not None:
+            return self.text_to_speech_stream_to_file(text, output_file, voice, response_format)
         
-        return output_path
+        # Use temporary file
+        suffix = f".{response_format}"
+        temp_file = tempfile.NamedTemporaryFile(
+            delete=False,
+            suffix=suffix,
+            prefix="tts_"
+        )
+        output_path = temp_file.name
+        temp_file.close()
+        
+        try:
+            return self.text_to_speech_stream_to_file(text, output_path, voice, response_format)
+        except BaseException:
+            # The temporary file is ours; remove it if the request failed
+            _remove_file(output_path)
+            raise
     
     async def streaming_text_to_speech(
         self,
@@ -173,11 +300,16 @@ class TTSClient:
         channels: int = 1,
         sample_width: int = 2,
         on_audio_chunk: Optional[Callable[[bytes], None]] = None,
-        play_audio: bool = True
+        play_audio: bool = True,
+        verbose: bool = False
     ) -> bytes:
         """
         Streaming text-to-speech (using WebSocket)
         
+        The realtime endpoint streams raw little-endian 16-bit PCM (24 kHz, mono),
+        which is written to PyAudio as-is with no client-side decoding. The
+        sample_rate/channels/sample_width defaults match that format.
+        
         Args:
             text: Text to convert
             voice: Voice ID, options: "ara", "rex", "sal", "eve", "una", "leo", default "ara"
@@ -186,6 +318,7 @@ class TTSClient:
             sample_width: Sample width in bytes, default 2 (16-bit)
             on_audio_chunk: Audio chunk callback function, receives bytes parameter
             play_audio: Whether to play audio in real-time, default True
+            verbose: Whether to print a line for every audio chunk, default False
             
         Returns:
             Complete audio data (bytes)
@@ -199,16 +332,126 @@ class TTSClient:
         if not text or not text.strip():
             raise ValueError("Text content cannot be empty")
         
-        # Build WebSocket URL
-        ws_url = self.base_url.replace("https://", "wss://").replace("http://", "ws://")
-        uri = f"{ws_url}/realtime/audio/speech"
+        import time
+        start_time = time.time()
+        
+        print(f"\n{'='*60}")
+        print(f"Starting Streaming TTS")
+        print(f"{'='*60}")
+        print(f"Text: {text[:50]}{'...' if len(text) > 50 else ''}")
+        print(f"Voice: {voice}")
+        print(f"Play Audio: {'Yes' if play_audio and HAS_PYAUDIO else 'No'}")
+        print(f"WebSocket URL: {self._ws_uri}")
+        
+        audio_bytes, stats = await self._realtime_speech(
+            [text], voice, sample_rate, channels, sample_width,
+            on_audio_chunk, play_audio, verbose, log=print
+        )
         
-        # Set headers
-        headers = {"Authorization": f"Bearer {self.api_key}"}
+        # Calculate and display statistics
+        total_time = time.time() - start_time
+        total_bytes = len(audio_bytes)
+        audio_duration = total_bytes / (sample_rate * channels * sample_width)
+        
+        print(f"\n{'='*60}")
+        print(f"Streaming TTS Complete")
+        print(f"{'='*60}")
+        print(f"Statistics:")
+        print(f"   - Audio chunks: {stats['chunk_count']}")
+        print(f"   - Total bytes: {total_bytes:,} bytes")
+        print(f"   - Audio duration: {audio_duration:.2f} seconds")
+        print(f"   - Total time: {total_time:.2f} seconds")
+        if stats["first_chunk_latency"] is not None:
+            print(f"   - First chunk latency: {stats['first_chunk_latency'] * 1000:.0f}ms")
+        if audio_duration > 0:
+            streaming_ratio = (total_time / audio_duration) * 100
+            print(f"   - Streaming efficiency: {streaming_ratio:.1f}%")
+            if streaming_ratio < 100:
+                print(f"   - Audio generation speed > playback speed (streaming advantage!)")
+        print(f"{'='*60}\n")
+        
+        return audio_bytes
+    
+    async def streaming_text_chunks_to_speech(
+        self,
+        chunks: AsyncIterable[str],
+        voice: str = "ara",
+        sample_rate: int = 24000,
+        channels: int = 1,
+        sample_width: int = 2,
+        on_audio_chunk: Optional[Callable[[bytes], None]] = None,
+        play_audio: bool = True,
+        verbose: bool = False,
+        on_text_sent: Optional[Callable[[str], None]] = None
+    ) -> bytes:
+        """
+        Streaming text-to-speech for text that arrives in pieces (e.g. sentences of an LLM reply)
+        
+        Opens one WebSocket and one playback stream for the whole text, so
+        speech starts before the text is complete and there are no gaps
+        between chunks. Each chunk is sent once the next one arrives (or the
+        input ends) so the final chunk can be flagged is_last. Prints nothing
+        unless verbose is set.
+        
+        Args:
+            chunks: Async iterable of text pieces, in speaking order
+            voice: Voice ID, default "ara"
+            sample_rate: Sample rate, default 24000
+            channels: Number of channels, default 1 (mono)
+            sample_width: Sample width in bytes, default 2 (16-bit)
+            on_audio_chunk: Audio chunk callback function, receives bytes parameter
+            play_audio: Whether to play audio in real-time, default True
+            verbose: Whether to print connection and per-chunk details, default False
+            on_text_sent: Called with each text chunk once it has been sent
+            
+        Returns:
+            Complete audio data (bytes), empty if chunks yielded no text
+            
+        Raises:
+            RuntimeError: WebSocket connection failed or other error
+        """
+        if not HAS_WEBSOCKETS:
+            raise RuntimeError("websockets library not installed, please run: pip install websockets")
+        
+        audio_bytes, _ = await self._realtime_speech(
+            chunks, voice, sample_rate, channels, sample_width,
+            on_audio_chunk, play_audio, verbose, log=print if verbose else _no_log,
+            on_text_sent=on_text_sent
+        )
+        return audio_bytes
+    
+    async def _realtime_speech(
+        self,
+        chunks: Union[Sequence[str], AsyncIterable[str]],
+        voice: str,
+        sample_rate: int,
+        channels: int,
+        sample_width: int,
+        on_audio_chunk: Optional[Callable[[bytes], None]],
+        play_audio: bool,
+        verbose: bool,
+        log: Callable[[str], None],
+        on_text_sent: Optional[Callable[[str], None]] = None
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Send text chunks over one realtime WebSocket while receiving and playing the audio
+        
+        Each chunk is sent once the next one is available (or the input ends),
+        so the real final chunk is the one sent with is_last; empty text is
+        never sent.
+        
+        Returns:
+            Complete audio data and statistics (chunk_count, first_chunk_latency in seconds)
+        """
+        if not HAS_WEBSOCKETS or websockets is None:
+            raise RuntimeError("websockets library not installed, please run: pip install websockets")
         
         # Initialize audio playback
         audio_stream = None
         p = None
+        frames_per_buffer = sample_rate // 20  # 50 ms
+        flush_size = frames_per_buffer * channels * sample_width
+        play_buf = bytearray()
         if play_audio:
             if not HAS_PYAUDIO or pyaudio is None:
                 play_audio = False
@@ -219,68 +462,102 @@ class TTSClient:
                     channels=channels,
                     rate=sample_rate,
                     output=True,
+                    frames_per_buffer=frames_per_buffer,
                 )
         
-        if not HAS_WEBSOCKETS or websockets is None:
-            raise RuntimeError("websockets library not installed, please run: pip install websockets")
-        
-        audio_bytes = b""
+        audio_chunks: list[bytes] = []
         chunk_count = 0
         first_chunk_time = None
+        request_sent_time = None
         import time
-        start_time = time.time()
         
-        print(f"\n{'='*60}")
-        print(f"Starting Streaming TTS")
-        print(f"{'='*60}")
-        print(f"Text: {text[:50]}{'...' if len(text) > 50 else ''}")
-        print(f"Voice: {voice}")
-        print(f"Play Audio: {'Yes' if play_audio else 'No'}")
-        print(f"WebSocket URL: {uri}")
+        # Single writer thread so playback never blocks the receive loop
+        play_queue: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        writer_thread = None
+        if play_audio and audio_stream:
+            writer_thread = threading.Thread(
+                target=_drain_audio,
+                args=(play_queue, audio_stream.write),
+                daemon=True,
+            )
+            writer_thread.start()
         
+        sender = None
         try:
-            print(f"\nConnecting to WebSocket...")
-            async with websockets.connect(uri, additional_headers=headers) as websocket:  # type: ignore
-                print(f"WebSocket connected successfully")
+            log(f"\nConnecting to WebSocket...")
+            async with websockets.connect(self._ws_uri, additional_headers=self._ws_headers) as websocket:  # type: ignore
+                log(f"WebSocket connected successfully")
+                
+                async def send_chunks():
+                    try:
+                        # Send config message
+                        config_message = _config_message(voice)
+                        await websocket.send(config_message)
+                        log(f"Sent config message: {config_message}")
+                        
+                        async def send_text(chunk: str, is_last: bool):
+                            nonlocal request_sent_time
+                            await websocket.send(_text_message(chunk, is_last))
+                            if request_sent_time is None:
+                                request_sent_time = time.time()
+                            log(f"Sent text chunk ({len(chunk)} characters)")
+                            if on_text_sent:
+                                on_text_sent(chunk)
+                        
+                        # Hold one chunk back so the real final chunk carries is_last
+                        # (empty text is never sent)
+                        held = None
+                        async for chunk in _aiter(chunks):
+                            if not chunk or not chunk.strip():
+                                continue
+                            if held is not None:
+                                await send_text(held, False)
+                            held = chunk
+                        if held is None:
+                            # Nothing to speak
+                            await websocket.close()
+                            return
+                        await send_text(held, True)
+                        log(f"Waiting for audio response...\n")
+                    except asyncio.CancelledError:
+                        raise
+                    except BaseException:
+                        # Unblock the receive loop; the error is re-raised below
+                        await websocket.close()
+                        raise
                 
-                # Send config message
-                config_message = {"type": "config", "data": {"voice_id": voice}}
-                await websocket.send(json.dumps(config_message))
-                print(f"Sent config message: {config_message}")
+                sender = asyncio.ensure_future(send_chunks())
                 
-                # Send text chunk
-                text_message = {
-                    "type": "text_chunk",
-                    "data": {"text": text, "is_last": True},
-                }
-                await websocket.send(json.dumps(text_message))
-                request_sent_time = time.time()
-                print(f"Sent text chunk ({len(text)} characters)")
-                print(f"Waiting for audio response...\n")
+                # Bind hot-loop callables to locals
+                on_chunk = on_audio_chunk
+                loop = asyncio.get_running_loop()
+                play_put = play_queue.put_nowait if writer_thread else None
                 
                 # Receive audio chunks
                 while True:
                     try:
                         response = await websocket.recv()
-                        data = json.loads(response)
+                        data = json_loads(response)
                         
-                        # Extract audio data
-                        audio_b64 = data["data"]["data"]["audio"]
-                        is_last = data["data"]["data"].get("is_last", False)
-                        
-                        # Decode audio
-                        chunk_bytes = base64.b64decode(audio_b64)
-                        audio_bytes += chunk_bytes
+                        # Extract and decode audio data
+                        inner = data["data"]["data"]
+                        is_last = inner.get("is_last", False)
+                        audio_b64 = inner["audio"]
+                        if len(audio_b64) > DECODE_OFFLOAD_THRESHOLD:
+                            chunk_bytes = await loop.run_in_executor(None, b64decode_audio, audio_b64)
+                        else:
+                            chunk_bytes = b64decode_audio(audio_b64)
+                        audio_chunks.append(chunk_bytes)
                         chunk_count += 1
                         
                         # Record time of first audio chunk
                         if first_chunk_time is None and len(chunk_bytes) > 0:
                             first_chunk_time = time.time()
-                            time_to_first_audio = (first_chunk_time - request_sent_time) * 1000
-                            print(f"First audio chunk received: {time_to_first_audio:.0f}ms")
+                            if request_sent_time is not None:
+                                log(f"First audio chunk received: {(first_chunk_time - request_sent_time) * 1000:.0f}ms")
                         
                         # Print each audio chunk info
-                        if len(chunk_bytes) > 0:
+                        if verbose and len(chunk_bytes) > 0:
                             print(f"Audio chunk #{chunk_count}: {len(chunk_bytes)} bytes", end="")
                             if is_last:
                                 print(" (last chunk)")
@@ -288,52 +565,61 @@ class TTSClient:
                                 print()
                         
                         # Call callback function
-                        if on_audio_chunk and len(chunk_bytes) > 0:
-                            on_audio_chunk(chunk_bytes)
+                        if on_chunk and len(chunk_bytes) > 0:
+                            on_chunk(chunk_bytes)
                         
                         # Play audio in real-time
-                        if play_audio and audio_stream and len(chunk_bytes) > 0:
-                            await asyncio.to_thread(audio_stream.write, chunk_bytes)
+                        # Coalesce small chunks into ~50 ms blocks before writing
+                        if play_put and len(chunk_bytes) > 0:
+                            play_buf += chunk_bytes
+                            if len(play_buf) >= flush_size or is_last:
+                                play_put(bytes(play_buf))
+                                play_buf.clear()
                         
-                        if is_last:
+                        # The server flags is_last on the audio for the text chunk sent with
+                        # is_last; any is_last seen before every chunk was sent is ignored
+                        if is_last and sender.done():
                             break
                             
                     except websockets.exceptions.ConnectionClosedOK:  # type: ignore
-                        print(f"WebSocket connection closed normally")
+                        log(f"WebSocket connection closed normally")
                         break
                     except websockets.exceptions.ConnectionClosedError as e:  # type: ignore
-                        print(f"WebSocket connection error: {e}")
+                        log(f"WebSocket connection error: {e}")
                         raise RuntimeError(f"WebSocket connection error: {e}")
+                
+                # Surface any error raised while sending
+                await sender
                         
+        except asyncio.CancelledError:
+            # Cancelled (e.g. user interrupt): drop audio not yet played
+            play_buf.clear()
+            while True:
+                try:
+                    play_queue.get_nowait()
+                except queue.Empty:
+                    break
+            raise
         finally:
-            # Clean up audio playback
+            if sender is not None and not sender.done():
+                sender.cancel()
+            # Let queued audio finish playing, then clean up playback
+            if writer_thread:
+                if play_buf:
+                    play_queue.put(bytes(play_buf))
+                play_queue.put(None)
+                await asyncio.to_thread(writer_thread.join)
             if audio_stream:
                 audio_stream.stop_stream()
                 audio_stream.close()
             if p:
                 p.terminate()
         
-        # Calculate and display statistics
-        total_time = time.time() - start_time
-        audio_duration = len(audio_bytes) / (sample_rate * channels * sample_width)
-        
-        print(f"\n{'='*60}")
-        print(f"Streaming TTS Complete")
-        print(f"{'='*60}")
-        print(f"Statistics:")
-        print(f"   - Audio chunks: {chunk_count}")
-        print(f"   - Total bytes: {len(audio_bytes):,} bytes")
-        print(f"   - Audio duration: {audio_duration:.2f} seconds")
-        print(f"   - Total time: {total_time:.2f} seconds")
-        if first_chunk_time:
-            time_to_first = (first_chunk_time - request_sent_time) * 1000
-            print(f"   - First chunk latency: {time_to_first:.0f}ms")
-        if audio_duration > 0:
-            streaming_ratio = (total_time / audio_duration) * 100
-            print(f"   - Streaming efficiency: {streaming_ratio:.1f}%")
-            if streaming_ratio < 100:
-                print(f"   - Audio generation speed > playback speed (streaming advantage!)")
-        print(f"{'='*60}\n")
-        
-        return audio_bytes
-
+        stats = {
+            "chunk_count": chunk_count,
+            "first_chunk_latency": (
+                first_chunk_time - request_sent_time
+                if first_chunk_time is not None and request_sent_time is not None else None
+            ),
+        }
+        return b"".join(audio_chunks), stats
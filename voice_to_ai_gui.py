@@ -5,21 +5,27 @@ Integrates recording, transcription, and AI conversation features
 """
 
 import pyaudio
-import wave
 import io
+import struct
+import uuid
 import threading
+import traceback
 import time
 import asyncio
 import tkinter as tk
 from tkinter import scrolledtext, ttk
-from typing import Optional
-from pathlib import Path
+from typing import Optional, Union, BinaryIO
+from collections import deque
 import requests
 import tempfile
 import os
+import re
 import platform
+import string
 from ai_client import AIClient
 from tts_client import TTSClient
+from api_key import read_api_key
+from http_session import create_session, create_async_client, apost
 from PIL import Image, ImageDraw, ImageFont, ImageTk
 
 HAS_PYGAME = False
@@ -41,6 +47,155 @@ if not HAS_PYGAME:
     except ImportError:
         pass
 
+# Try importing httpx for async HTTP/2 transcription
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+    httpx = None
+
+# Try importing numpy and numba for voice activity detection
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+try:
+    from numba import njit
+    HAS_NUMBA = HAS_NUMPY
+except ImportError:
+    HAS_NUMBA = False
+    njit = None
+
+# Sentence end: terminal punctuation followed by whitespace, or a newline.
+# Punctuation inside a token ("3.14", "x.ai") does not end a sentence.
+_SENTENCE_END = re.compile(r"[.!?](?=\s)|\n")
+
+
+def _split_sentences(text: str):
+    """
+    Split complete sentences off the front of streamed text
+    
+    Args:
+        text: Text received so far
+        
+    Returns:
+        (complete sentences, remaining text)
+    """
+    end = 0
+    for match in _SENTENCE_END.finditer(text):
+        end = match.end()
+    return text[:end], text[end:]
+
+
+def _active_region(samples, win: int, thresh: float):
+    """
+    Find the span of windows whose RMS reaches a threshold
+    
+    Args:
+        samples: 1-D int16 sample array
+        win: Window length in samples
+        thresh: RMS threshold
+        
+    Returns:
+        (start, end) sample indices of the active region, (0, 0) if all silent
+    """
+    n = samples.shape[0]
+    thresh_sq = thresh * thresh * win
+    start = -1
+    end = 0
+    for i in range(0, n - win + 1, win):
+        acc = 0.0
+        for j in range(i, i + win):
+            s = float(samples[j])
+            acc += s * s
+        if acc >= thresh_sq:
+            if start < 0:
+                start = i
+            end = i + win
+    if start < 0:
+        return 0, 0
+    return start, end
+
+
+if HAS_NUMBA:
+    _active_region = njit(cache=True, fastmath=True)(_active_region)
+
+
+def _render_rotated_glyph(ch: str, font, height: int):
+    """
+    Render a single character white-on-black and rotate it 180 degrees
+    
+    Args:
+        ch: Character to render
+        font: PIL font
+        height: Glyph image height (font line height)
+        
+    Returns:
+        Rotated glyph image
+    """
+    width = max(1, int(round(font.getlength(ch))))
+    img = Image.new('RGB', (width, height), color='black')
+    ImageDraw.Draw(img).text((0, 0), ch, font=font, fill='white')
+    return img.rotate(180)
+
+
+def _build_wav(frames, channels: int, sampwidth: int, sample_rate: int) -> bytearray:
+    """
+    Pack PCM frames into a WAV file in a single preallocated buffer
+    
+    Args:
+        frames: Sequence of raw PCM byte chunks
+        channels: Number of channels
+        sampwidth: Sample width in bytes
+        sample_rate: Sample rate
+        
+    Returns:
+        WAV file contents (44-byte RIFF header followed by the PCM data)
+    """
+    total = sum(map(len, frames))
+    buf = bytearray(44 + total)
+    block_align = channels * sampwidth
+    struct.pack_into(
+        '<4sI4s4sIHHIIHH4sI', buf, 0,
+        b'RIFF', 36 + total, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * block_align, block_align, sampwidth * 8,
+        b'data', total
+    )
+    view = memoryview(buf)
+    offset = 44
+    for frame in frames:
+        view[offset:offset + len(frame)] = frame
+        offset += len(frame)
+    return buf
+
+
+def _encode_multipart_file(field: str, filename: str, content_type: str, data) -> tuple:
+    """
+    Encode a single file as a multipart/form-data body in one pass
+    
+    Args:
+        field: Form field name
+        filename: File name sent to the server
+        content_type: MIME type of the file
+        data: File contents (bytes-like)
+        
+    Returns:
+        (body bytes, Content-Type header value)
+    """
+    boundary = uuid.uuid4().hex
+    head = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'
+    ).encode('utf-8')
+    tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return b''.join((head, data, tail)), f'multipart/form-data; boundary={boundary}'
+
 
 class VoiceToAIGUI:
     """GUI application for voice to text and AI interface"""
@@ -50,8 +205,10 @@ class VoiceToAIGUI:
                  stt_api_key_file: Optional[str] = None,
                  sample_rate: int = 24000, 
                  channels: int = 1, 
-                 chunk: int = 1024, 
-                 min_duration: float = 0.5):
+                 chunk: int = 2048, 
+                 min_duration: float = 0.5,
+                 vad_threshold: Optional[float] = 300.0,
+                 max_recording_seconds: float = 30):
         """
         Initialize GUI application
         
@@ -60,37 +217,72 @@ class VoiceToAIGUI:
             stt_api_key_file: Path to API key file for speech-to-text, if None uses api_key_file
             sample_rate: Sample rate, default 24000
             channels: Number of channels, default 1 (mono)
-            chunk: Audio chunk size, default 1024
+            chunk: Audio chunk size, default 2048
             min_duration: Minimum recording duration (seconds), default 0.5
+            vad_threshold: RMS level (int16) a 30 ms window must reach to count as speech;
+                silent recordings are not uploaded. None disables the check. Needs numba.
+            max_recording_seconds: Longest audio kept per recording; holding the button longer
+                keeps only the most recent audio, default 30
         """
         self.sample_rate = sample_rate
         self.channels = channels
         self.chunk = chunk
         self.format = pyaudio.paInt16
-        self.frames = []
         self.is_recording = False
-        self.audio = None
-        self.stream = None
         self.min_duration = min_duration
-        self.recording_thread = None
+        # Verbose diagnostics (tracebacks, [DEBUG] prints) only when NEUROHUD_DEBUG is set
+        self.debug = bool(os.environ.get("NEUROHUD_DEBUG"))
+        self.vad_threshold = vad_threshold
         self.recording_start_time = None
         
-        # Add interrupt flag and processing thread reference
+        # Add interrupt flag and processing future reference
         self.is_processing = False
         self.interrupt_processing = False
-        self.current_process_thread = None
+        self.current_process_future = None
         
         self.ai_client = AIClient(api_key_file)
 
         self.tts_client = TTSClient(api_key_file)
         self.tts_voice = "ara" 
         self.use_streaming_tts = True  
+        
+        # Persistent event loop for audio processing and TTS, shared by every reply
+        self._tts_loop = asyncio.new_event_loop()
+        self._tts_thread = threading.Thread(target=self._tts_loop.run_forever, daemon=True)
+        self._tts_thread.start()
+        self._playback_stop = threading.Event()
 
         if stt_api_key_file is None:
             stt_api_key_file = api_key_file
         self.stt_api_key = self._read_api_key(stt_api_key_file)
         self.stt_base_url = "https://api.x.ai/v1"
         self.stt_api_url = f"{self.stt_base_url}/audio/transcriptions"
+        # Keep-alive session for transcription; requests sets the multipart Content-Type
+        self._http = create_session(self.stt_api_key, content_type=None, pool_maxsize=4)
+        # Async HTTP/2 client for transcription on the event loop (created on first use)
+        self._aio = None
+        
+        # Open the input stream once and only start/stop it per recording
+        self.audio = pyaudio.PyAudio()
+        self._sampwidth = self.audio.get_sample_size(self.format)
+        
+        # Ring buffer allocated once; the input callback writes into it at _rec_pos
+        # and only the most recent max_recording_seconds of audio are kept
+        frame_size = self.channels * self._sampwidth
+        self._rec_buf = bytearray(int(max_recording_seconds * self.sample_rate) * frame_size)
+        self._rec_pos = 0
+        self._rec_filled = 0
+        
+
+        self.stream = self.audio.open(
+            format=self.format,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.chunk,
+            start=False,
+            stream_callback=self._on_audio
+        )
         
         # Create GUI
         self.root = tk.Tk()
@@ -110,32 +302,92 @@ class VoiceToAIGUI:
         # Keep window always on top
         self.root.attributes('-topmost', True)
         
-        # Bind ESC to close
-        self.root.bind('<Escape>', lambda e: self.root.destroy())
+        # Bind ESC and window close to shutdown
+        self.root.bind('<Escape>', lambda e: self.close())
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         
         # Ensure window can receive keyboard events
         self.root.focus_force()
         
+        # Scrolling character display state; the deque evicts the oldest char itself
+        self.max_chars = 25
+        self.char_queue = deque(maxlen=self.max_chars)
+        self._text_dirty = False
+        
+        # 180-degree rotated glyph cache and reusable canvas for the text display,
+        # set up on first use
+        self._font = None
+        self._glyph_height = 0
+        self._glyphs = {}
+        self._canvas = None
+        self._canvas_draw = None
+        self._rendered_text = None
+        
         self.setup_ui()
         
         # Make window draggable from anywhere
         self.root.bind('<Button-1>', self.start_move)
         self.root.bind('<B1-Motion>', self.do_move)
         
-    def _read_api_key(self, filename: str) -> str:
-        """Read API key from file"""
+        # Move one-time startup costs off the first recording
+        threading.Thread(target=self._warmup, daemon=True).start()
+        if HAS_HTTPX:
+            asyncio.run_coroutine_threadsafe(self._preconnect_aio(), self._tts_loop)
+        
+    def _warmup(self):
+        """Compile the VAD scan and open the chat connection before the first recording"""
         try:
-            key_path = Path(filename)
-            if not key_path.exists():
-                raise FileNotFoundError(f"API key file not found: {filename}")
-            
-            api_key = key_path.read_text(encoding="utf-8").strip()
-            if not api_key:
-                raise ValueError(f"API key file is empty: {filename}")
-            
-            return api_key
+            if HAS_NUMBA:
+                # Same argument types as the real call (writable int16 array, int, float)
+                # so numba doesn't compile again on the Tk thread
+                _active_region(np.zeros(64, dtype=np.int16), 16, 1.0)
+            self.ai_client.preconnect()
+        except Exception as e:
+            print(f"Warmup failed: {e}")
+    
+    def _get_aio(self):
+        """Shared async transcription client, created on the event loop on first use"""
+        if self._aio is None:
+            self._aio = create_async_client(self.stt_api_key, content_type=None)
+        return self._aio
+    
+    async def _preconnect_aio(self):
+        """Open the transcription connection ahead of the first recording (errors ignored)"""
+        try:
+            await self._get_aio().head(self.stt_base_url, timeout=5)
         except Exception as e:
-            raise RuntimeError(f"Failed to read API key: {e}")
+            if self.debug:
+                print(f"[DEBUG] Transcription preconnect failed: {e}")
+        
+    def _read_api_key(self, filename: str) -> str:
+        """Read API key from file"""
+        return read_api_key(filename)
+    
+    def close(self):
+        """Release audio resources and close the window"""
+        self.is_recording = False
+        if self.stream:
+            try:
+                self.stream.close()
+            except Exception as e:
+                print(f"Error closing stream: {e}")
+            self.stream = None
+        if self.audio:
+            self.audio.terminate()
+            self.audio = None
+        if self.current_process_future:
+            self.current_process_future.cancel()
+        if self._aio is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._aio.aclose(), self._tts_loop).result(timeout=1.0)
+            except Exception as e:
+                print(f"Error closing HTTP client: {e}")
+            self._aio = None
+        self._tts_loop.call_soon_threadsafe(self._tts_loop.stop)
+        self._http.close()
+        self.ai_client.close()
+        self.tts_client.close()
+        self.root.destroy()
     
     def setup_ui(self):
         """Setup UI interface"""
@@ -159,6 +411,9 @@ class VoiceToAIGUI:
         )
         self.record_button.place(relx=0.5, rely=0.5, anchor="center")  # Centered
         
+        # Rotated text display (not placed in the compact window)
+        self.word_display = tk.Label(main_frame, bg='black')
+        
         # Bind mouse events
         self.record_button.bind("<Button-1>", self.on_button_press)
         self.record_button.bind("<ButtonRelease-1>", self.on_button_release)
@@ -181,46 +436,70 @@ class VoiceToAIGUI:
     def add_char_to_display(self, char: str):
         """Add character to scrolling display (max 25 characters) with mirror and rotation"""
         self.char_queue.append(char)
-        if len(self.char_queue) > self.max_chars:
-            self.char_queue.pop(0)  # Remove first character
+        
+        # Coalesce redraws: render once per Tk idle tick, not once per character
+        if not self._text_dirty:
+            self._text_dirty = True
+            self.root.after_idle(self._flush_text)
+    
+    def _flush_text(self):
+        """Redraw the character display once for all characters added since the last redraw"""
+        self._text_dirty = False
         
         # Create mirrored and rotated text image
         display_text = "".join(self.char_queue)
         if display_text:
             self.update_rotated_text(display_text)
         else:
+            self._rendered_text = None
             self.word_display.config(image='')
     
-    def update_rotated_text(self, text: str):
-        """Create and display 180-degree rotated text image"""
-        # Create image with text
+    def _init_text_canvas(self):
+        """Load the display font and allocate the reusable text canvas"""
         font_size = 24
         try:
-            font = ImageFont.truetype("arial.ttf", font_size)
+            self._font = ImageFont.truetype("arial.ttf", font_size)
         except:
-            font = ImageFont.load_default()
-        
-        # Calculate text size
-        dummy_img = Image.new('RGB', (1, 1))
-        draw = ImageDraw.Draw(dummy_img)
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        
-        # Create image
+            self._font = ImageFont.load_default()
+        # Line height from the glyph extents; bitmap fonts have no getmetrics()
+        self._glyph_height = self._font.getbbox(string.ascii_letters + string.digits + string.punctuation)[3]
+        self._canvas = Image.new('RGB', (500, self._glyph_height + 10), color='black')
+        self._canvas_draw = ImageDraw.Draw(self._canvas)
+    
+    def update_rotated_text(self, text: str):
+        """Create and display 180-degree rotated text image"""
+        if text == self._rendered_text:
+            return
+        if self._font is None:
+            self._init_text_canvas()
+        
+        # Collect pre-rotated glyphs, rendering any character not cached yet
+        glyphs = []
+        for ch in text:
+            glyph = self._glyphs.get(ch)
+            if glyph is None:
+                glyph = _render_rotated_glyph(ch, self._font, self._glyph_height)
+                self._glyphs[ch] = glyph
+            glyphs.append(glyph)
+        
+        # Grow the canvas if the text no longer fits
+        text_width = sum(glyph.width for glyph in glyphs)
         img_width = max(text_width + 20, 500)
-        img_height = text_height + 10
-        img = Image.new('RGB', (img_width, img_height), color='black')
-        draw = ImageDraw.Draw(img)
-        
-        # Draw white text
-        draw.text((10, 5), text, font=font, fill='white')
+        if img_width > self._canvas.width:
+            self._canvas = Image.new('RGB', (img_width, self._canvas.height), color='black')
+            self._canvas_draw = ImageDraw.Draw(self._canvas)
+        else:
+            self._canvas_draw.rectangle((0, 0, self._canvas.width, self._canvas.height), fill='black')
         
-        # Rotate 180 degrees (upside down and horizontally flipped)
-        img = img.rotate(180)
+        # Rotated text reads right-to-left: the first character sits at the right edge
+        x = self._canvas.width - 10
+        for glyph in glyphs:
+            x -= glyph.width
+            self._canvas.paste(glyph, (x, 5))
         
         # Convert to PhotoImage
-        photo = ImageTk.PhotoImage(img)
+        photo = ImageTk.PhotoImage(self._canvas)
+        self._rendered_text = text
         
         # Keep reference to prevent garbage collection
         self.word_display.image = photo
@@ -228,7 +507,8 @@ class VoiceToAIGUI:
     
     def clear_char_display(self):
         """Clear character display"""
-        self.char_queue = []
+        self.char_queue.clear()
+        self._rendered_text = None
         self.word_display.config(text="")
     
     def update_duration(self):
@@ -270,26 +550,21 @@ class VoiceToAIGUI:
             self.interrupt_processing = True
             self.clear_char_display()
         
+        # Stop any reply that is still being generated or spoken
+        if self.current_process_future and not self.current_process_future.done():
+            self.current_process_future.cancel()
+        self._playback_stop.set()
+        
+        self._rec_pos = 0
+        self._rec_filled = 0
         self.is_recording = True
-        self.frames = []
         self.recording_start_time = time.time()
         
-        self.audio = pyaudio.PyAudio()
-        self.stream = self.audio.open(
-            format=self.format,
-            channels=self.channels,
-            rate=self.sample_rate,
-            input=True,
-            frames_per_buffer=self.chunk
-        )
+        self.stream.start_stream()
         
         # Update UI
         self.record_button.config(fg="#0D47A1", text="◉")  # Dark blue circle when recording
         self.update_duration()
-        
-        # Start recording thread
-        self.recording_thread = threading.Thread(target=self.record_loop, daemon=True)
-        self.recording_thread.start()
     
     def stop_recording_and_process(self):
         """Stop recording and process"""
@@ -298,80 +573,87 @@ class VoiceToAIGUI:
         
         self.is_recording = False
         
-        # Wait for recording thread to finish
-        if self.recording_thread and self.recording_thread.is_alive():
-            self.recording_thread.join(timeout=1.0)
-        
-        # Stop stream
+        # Stop stream (kept open for the next recording)
         if self.stream:
             try:
                 self.stream.stop_stream()
-                self.stream.close()
             except Exception as e:
                 print(f"Error stopping stream: {e}")
-            finally:
-                self.stream = None
         
-        # Calculate recording duration
-        duration = len(self.frames) * self.chunk / self.sample_rate
+        # Calculate duration before touching the audio
+        duration = self._rec_filled / (self._sampwidth * self.channels * self.sample_rate)
         
         # Update UI (keep button enabled)
         self.record_button.config(fg="#42A5F5", text="○")  # Light blue circle when processing
         
         if duration < self.min_duration:
             self.record_button.config(fg="#1E88E5", text="●")  # Back to blue
-            if self.audio:
-                self.audio.terminate()
-                self.audio = None
             return
         
-        # Convert to WAV format
-        wav_buffer = io.BytesIO()
-        if self.audio:
-            with wave.open(wav_buffer, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.audio.get_sample_size(self.format))
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(b''.join(self.frames))
-            
-            self.audio.terminate()
-            self.audio = None
+        # View recorded audio in place; unwrap the ring only if it overflowed
+        view = memoryview(self._rec_buf)
+        if self._rec_filled < len(self._rec_buf):
+            recorded = view[:self._rec_filled]
+        else:
+            head = self._rec_pos
+            # bytearray keeps the samples writable, matching the warmed-up VAD signature
+            recorded = memoryview(bytearray().join((view[head:], view[:head])))
+        
+        # Skip silent clips and trim leading/trailing silence before upload
+        if HAS_NUMBA and self.vad_threshold is not None:
+            samples = np.frombuffer(recorded, dtype=np.int16)
+            win = max(1, int(0.03 * self.sample_rate)) * self.channels
+            start, end = _active_region(samples, win, float(self.vad_threshold))
+            if end <= start:
+                self.record_button.config(fg="#1E88E5", text="●")  # Back to blue
+                return
+            start = max(0, start - win)
+            end = min(len(samples), end + win)
+            recorded = recorded[start * self._sampwidth:end * self._sampwidth]
         
-        audio_data = wav_buffer.getvalue()
+        # Convert to WAV format (copies out of the recording buffer)
+        audio_data = _build_wav([recorded], self.channels, self._sampwidth, self.sample_rate)
         
-        # Set processing flag
+        # Set processing flag; each reply gets its own stop event so a stale
+        # reply still fetching fallback audio can never be un-stopped
         self.is_processing = True
         self.interrupt_processing = False
+        playback_stop = threading.Event()
+        self._playback_stop = playback_stop
         
-        # Process audio in new thread
-        def process_in_thread():
+        # Process audio on the persistent event loop
+        async def process_in_loop():
             try:
-                self.process_audio(audio_data)
+                await self.process_audio(audio_data, playback_stop)
             except Exception as e:
                 if not self.interrupt_processing:
                     error_msg = str(e)
                     self.root.after(0, lambda msg=error_msg: self.show_error(f"Error processing audio: {msg}"))
-                    import traceback
-                    traceback.print_exc()
+                    if self.debug:
+                        traceback.print_exc()
             finally:
                 self.is_processing = False
         
-        self.current_process_thread = threading.Thread(target=process_in_thread, daemon=True)
-        self.current_process_thread.start()
+        self.current_process_future = asyncio.run_coroutine_threadsafe(process_in_loop(), self._tts_loop)
     
-    def record_loop(self):
-        """Recording loop (runs in separate thread)"""
-        while self.is_recording:
-            if self.stream:
-                try:
-                    data = self.stream.read(self.chunk, exception_on_overflow=False)
-                    self.frames.append(data)
-                except Exception as e:
-                    error_msg = str(e)
-                    self.root.after(0, lambda msg=error_msg: self.show_error(f"Recording error: {msg}"))
-                    break
-            else:
-                break
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio input callback (runs on PortAudio's audio thread)"""
+        if self.is_recording:
+            buf = self._rec_buf
+            cap = len(buf)
+            data = memoryview(in_data)
+            if len(data) > cap:
+                data = data[-cap:]
+            n = len(data)
+            pos = self._rec_pos
+            # Write up to the end of the ring, then wrap to the start
+            first = min(n, cap - pos)
+            buf[pos:pos + first] = data[:first]
+            if n > first:
+                buf[:n - first] = data[first:]
+            self._rec_pos = (pos + n) % cap
+            self._rec_filled = min(self._rec_filled + n, cap)
+        return (None, pyaudio.paContinue)
     
     def transcribe_audio(self, audio_data: bytes) -> str:
         """
@@ -383,23 +665,14 @@ class VoiceToAIGUI:
         Returns:
             Transcribed text
         """
-        headers = {
-            "Authorization": f"Bearer {self.stt_api_key}",
-        }
-        
-        # Create temporary file object
-        audio_file = io.BytesIO(audio_data)
-        audio_file.name = "recording.wav"
-        
-        files = {
-            "file": (audio_file.name, audio_file, "audio/wav")
-        }
+        # Build the multipart body directly around the WAV buffer
+        body, content_type = _encode_multipart_file("file", "recording.wav", "audio/wav", audio_data)
         
         try:
-            response = requests.post(
+            response = self._http.post(
                 self.stt_api_url, 
-                headers=headers, 
-                files=files,
+                data=body,
+                headers={"Content-Type": content_type},
                 timeout=30
             )
             response.raise_for_status()
@@ -417,16 +690,48 @@ class VoiceToAIGUI:
                     error_msg += f"\nResponse: {e.response.text}"
             raise RuntimeError(error_msg)
     
-    def process_audio(self, audio_data: bytes):
-        """Process audio: transcribe -> call AI"""
+    async def _transcribe(self, audio_data: bytes) -> str:
+        """
+        Transcribe audio on the event loop using a shared async HTTP/2 client
+        
+        Falls back to the blocking transcribe_audio in a worker thread if httpx is not installed.
+        
+        Args:
+            audio_data: WAV format audio data (bytes)
+            
+        Returns:
+            Transcribed text
+        """
+        if not HAS_HTTPX or httpx is None:
+            return await asyncio.to_thread(self.transcribe_audio, audio_data)
+        
+        body, content_type = _encode_multipart_file("file", "recording.wav", "audio/wav", audio_data)
+        try:
+            response = await apost(
+                self._get_aio(),
+                self.stt_api_url,
+                content=body,
+                headers={"Content-Type": content_type}
+            )
+            response.raise_for_status()
+            return response.json().get('text', '')
+        except httpx.HTTPStatusError as e:
+            raise RuntimeError(f"Transcription failed: {e}\nResponse: {e.response.text}")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Transcription failed: {e}")
+    
+    async def process_audio(self, audio_data: bytes, playback_stop: Optional[threading.Event] = None):
+        """Process audio: transcribe -> stream AI reply -> speak it sentence by sentence"""
         # Step 1: Transcribe
         try:
             if self.interrupt_processing:
                 return
             
-            print(f"[DEBUG] Starting transcription, audio size: {len(audio_data)} bytes")
-            transcript = self.transcribe_audio(audio_data)
-            print(f"[DEBUG] Transcription result: {transcript}")
+            if self.debug:
+                print(f"[DEBUG] Starting transcription, audio size: {len(audio_data)} bytes")
+            transcript = await self._transcribe(audio_data)
+            if self.debug:
+                print(f"[DEBUG] Transcription result: {transcript}")
             
             if not transcript or self.interrupt_processing:
                 if not self.interrupt_processing:
@@ -435,8 +740,8 @@ class VoiceToAIGUI:
             
         except Exception as e:
             print(f"[ERROR] Transcription failed: {e}")
-            import traceback
-            traceback.print_exc()
+            if self.debug:
+                traceback.print_exc()
             self.root.after(0, lambda msg=str(e): self.show_error(f"Transcription failed: {msg}"))
             return
         
@@ -445,104 +750,161 @@ class VoiceToAIGUI:
             if self.interrupt_processing:
                 return
             
-            print(f"[DEBUG] Calling AI with transcript: {transcript}")
-            response = self.ai_client.chat(transcript)
-            ai_text = self.ai_client.get_response_text(response)
-            print(f"[DEBUG] AI response: {ai_text}")
+            if self.debug:
+                print(f"[DEBUG] Calling AI with transcript: {transcript}")
+            # Step 3: Speak each sentence as soon as the stream completes it
+            ai_text = await self._stream_and_speak(transcript, playback_stop or threading.Event())
+            if self.debug:
+                print(f"[DEBUG] AI response: {ai_text}")
             
             if not ai_text or self.interrupt_processing:
                 if not self.interrupt_processing:
                     self.root.after(0, lambda: self.show_error("AI response is empty"))
                 return
             
-            # Step 3: Convert to speech and play (with interrupt check)
-            if not self.interrupt_processing:
-                try:
-                    self.convert_and_play_tts(ai_text)
-                except Exception as e:
-                    pass  # Ignore TTS errors
-            
             self.root.after(0, self.on_processing_complete)
             
         except Exception as e:
             print(f"[ERROR] AI call failed: {e}")
-            import traceback
-            traceback.print_exc()
+            if self.debug:
+                traceback.print_exc()
             self.root.after(0, lambda msg=str(e): self.show_error(f"AI call failed: {msg}"))
     
-    def on_processing_complete(self):
-        """Processing complete callback"""
-        if not self.interrupt_processing:
-            self.record_button.config(fg="#1E88E5", text="●")  # Blue circle
-    
-    def convert_and_play_tts(self, text: str):
+    async def _stream_and_speak(self, transcript: str, playback_stop: threading.Event) -> str:
         """
-        Convert text to speech and play (using streaming TTS)
+        Stream the AI reply and speak it sentence by sentence while it is generated
         
         Args:
-            text: Text to convert
+            transcript: User's transcribed speech
+            playback_stop: Set to stop this reply's fallback playback
+            
+        Returns:
+            Full AI reply text
         """
-        # Process streaming TTS in new thread to avoid blocking UI
-        def tts_in_thread():
+        loop = asyncio.get_running_loop()
+        sentences: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        
+        def produce():
+            # Runs in a worker thread: chat_stream is a blocking generator
             try:
-                # Create new event loop (because we're in a thread)
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                # Define audio chunk callback
-                def on_audio_chunk(chunk: bytes):
-                    # Can process each audio chunk here if needed
-                    pass
-                
-                # Use streaming TTS (auto-play)
-                try:
-                    loop.run_until_complete(
-                        self.tts_client.streaming_text_to_speech(
-                            text=text,
-                            voice=self.tts_voice,
-                            on_audio_chunk=on_audio_chunk,
-                            play_audio=True
-                        )
-                    )
-                finally:
-                    loop.close()
-                    
+                pending = ""
+                for piece in self.ai_client.chat_stream(transcript):
+                    if stop.is_set():
+                        return
+                    done, pending = _split_sentences(pending + piece)
+                    if done:
+                        loop.call_soon_threadsafe(sentences.put_nowait, done)
+                if pending:
+                    loop.call_soon_threadsafe(sentences.put_nowait, pending)
+            finally:
+                loop.call_soon_threadsafe(sentences.put_nowait, None)
+        
+        producer = asyncio.ensure_future(asyncio.to_thread(produce))
+        reply = []
+        to_speak = []
+        sent = 0
+        finished = False
+        
+        def add(sentence: str) -> bool:
+            reply.append(sentence)
+            if sentence.strip() and not self.interrupt_processing:
+                to_speak.append(sentence.strip())
+                return True
+            return False
+        
+        async def reply_sentences():
+            nonlocal finished
+            while True:
+                sentence = await sentences.get()
+                if sentence is None:
+                    finished = True
+                    return
+                if add(sentence):
+                    yield to_speak[-1]
+        
+        def on_text_sent(text: str):
+            nonlocal sent
+            sent += 1
+        
+        try:
+            try:
+                # One TTS connection and playback stream for the whole reply
+                await self.tts_client.streaming_text_chunks_to_speech(
+                    reply_sentences(),
+                    voice=self.tts_voice,
+                    play_audio=True,
+                    on_text_sent=on_text_sent
+                )
             except Exception as e:
-                # If streaming TTS fails, try non-streaming TTS as fallback
-                try:
-                    audio_data = self.tts_client.text_to_speech(text, voice=self.tts_voice.capitalize(), response_format="mp3")
-                    
-                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3", prefix="tts_")
-                    temp_path = temp_file.name
-                    temp_file.write(audio_data)
-                    temp_file.close()
-                    
-                    self.play_audio(temp_path)
-                    
+                if self.debug:
+                    print(f"[DEBUG] Streaming TTS failed: {e}")
+                # Collect the rest of the reply and speak only the sentences
+                # never sent over the websocket with non-streaming TTS
+                while not finished:
+                    sentence = await sentences.get()
+                    if sentence is None:
+                        break
+                    add(sentence)
+                text = " ".join(to_speak[sent:])
+                if text and not self.interrupt_processing:
                     try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
-                except Exception as e2:
-                    pass  # Ignore all TTS errors
+                        await asyncio.to_thread(self._play_tts_fallback, text, playback_stop)
+                    except Exception:
+                        pass  # Ignore all TTS errors
+            await producer
+        finally:
+            stop.set()
+        
+        return "".join(reply).strip()
+    
+    def on_processing_complete(self):
+        """Processing complete callback"""
+        if not self.interrupt_processing:
+            self.record_button.config(fg="#1E88E5", text="●")  # Blue circle
+    
+    def _play_tts_fallback(self, text: str, playback_stop: threading.Event):
+        """Fetch the whole reply with non-streaming TTS and play it unless the reply was interrupted"""
+        if HAS_PYGAME:
+            # pygame can play WAV straight from memory, no temp file needed
+            audio_data = self.tts_client.text_to_speech(text, voice=self.tts_voice.capitalize(), response_format="wav")
+            if not playback_stop.is_set():
+                self.play_audio(io.BytesIO(audio_data), playback_stop)
+            return
+        
+        audio_data = self.tts_client.text_to_speech(text, voice=self.tts_voice.capitalize(), response_format="mp3")
+        if playback_stop.is_set():
+            return
         
-        thread = threading.Thread(target=tts_in_thread, daemon=True)
-        thread.start()
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3", prefix="tts_")
+        temp_path = temp_file.name
+        temp_file.write(audio_data)
+        temp_file.close()
+        
+        self.play_audio(temp_path, playback_stop)
+        
+        try:
+            os.unlink(temp_path)
+        except:
+            pass
     
-    def play_audio(self, audio_file: str):
+    def play_audio(self, audio_file: Union[str, BinaryIO], stop_event: Optional[threading.Event] = None):
         """
         Play audio file
         
         Args:
-            audio_file: Path to audio file
+            audio_file: Path to audio file, or an in-memory file object (pygame only)
+            stop_event: Set to stop playback early (pygame only), default None
         """
+        if stop_event is None:
+            stop_event = threading.Event()
         if HAS_PYGAME and pygame is not None:
             try:
-                pygame.mixer.music.load(audio_file)  # type: ignore
-                pygame.mixer.music.play()  # type: ignore
-                # Wait for playback to complete
-                while pygame.mixer.music.get_busy():  # type: ignore
-                    time.sleep(0.1)
+                sound = pygame.mixer.Sound(audio_file)  # type: ignore
+                sound.play()
+                # Block once for the clip length (or until interrupted) instead of polling
+                if stop_event.wait(sound.get_length()):
+                    sound.stop()
             except Exception as e:
                 raise RuntimeError(f"pygame playback failed: {e}")
         elif HAS_PLAYSOUND and playsound is not None: